@@ -1,25 +1,333 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 from langchain_groq import ChatGroq
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.tools import Tool
 from dotenv import load_dotenv
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
 import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import httpx
+
+import diskcache
+import faiss
+import numpy as np
+import tiktoken
+from aiolimiter import AsyncLimiter
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM
-llm = ChatGroq(
-    model="mixtral-8x7b-32768",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    api_key=os.getenv("GROQ_API_KEY")
-)
-
-@dataclass
+# Exact-match cache for the expensive research/strategy artifacts. Keyed by
+# a hash of only the fields that influence each artifact, so regenerating
+# with unchanged inputs (e.g. after toggling sections) skips the LLM call.
+artifact_cache = diskcache.Cache("./.copy_cache")
+
+def cached_artifact(name, key_fields):
+    """Cache an async agent method's string output on disk.
+
+    `key_fields` maps the method's arguments to the dict of values that
+    actually determine the output; anything else can change without
+    invalidating the cache entry.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            payload = json.dumps(key_fields(*args, **kwargs), sort_keys=True)
+            key = f"{name}:{hashlib.sha256(payload.encode()).hexdigest()}"
+            cached = artifact_cache.get(key)
+            if cached is not None:
+                return cached
+            result = await func(self, *args, **kwargs)
+            artifact_cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
+
+class SemanticCache:
+    """Similarity cache over fully-rendered prompts.
+
+    Prompts within `threshold` cosine similarity of a stored prompt reuse
+    the stored LLM response, so near-duplicate regenerations (a reworded
+    brand voice, extra whitespace in the audience description) skip the
+    LLM entirely. Each agent gets its own index so a copywriter prompt can
+    never match an editor prompt, and each entry carries exact `meta`
+    discriminators (mode, section, tone, length) that must match verbatim
+    before a hit is accepted — the section prompts share hundreds of
+    tokens of identical context and differ in a single line, so cosine
+    similarity alone cannot tell "homepage" from "pricing" or medium from
+    long. Index and payloads persist under `cache_dir` across runs.
+    """
+
+    EMBED_DIM = 384        # all-MiniLM-L6-v2
+    SEARCH_K = 8           # nearest neighbours scanned for a meta match
+    PERSIST_INTERVAL = 60  # seconds between write-behind flushes
+    _model = None          # embedder shared across instances, loaded on first use
+    _instances = []        # every cache, flushed at interpreter exit
+
+    def __init__(self, name: str, threshold: float = 0.93,
+                 ttl: Optional[float] = None, cache_dir: str = "./.sem_cache"):
+        self.name = name
+        self.threshold = threshold
+        self.ttl = ttl
+        self._dir = Path(cache_dir)
+        self._dir.mkdir(exist_ok=True)
+        self._index_path = self._dir / f"{name}.faiss"
+        self._payload_path = self._dir / f"{name}.json"
+        if self._index_path.exists() and self._payload_path.exists():
+            self._index = faiss.read_index(str(self._index_path))
+            self._payloads = json.loads(self._payload_path.read_text())
+        else:
+            self._index = faiss.IndexFlatIP(self.EMBED_DIM)
+            self._payloads = []
+        # Concurrent session threads share these caches; faiss add/search
+        # and the payload list are not thread-safe on their own.
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_persist = time.monotonic()
+        SemanticCache._instances.append(self)
+
+    @classmethod
+    def _embed(cls, text: str) -> np.ndarray:
+        if cls._model is None:
+            from sentence_transformers import SentenceTransformer
+            cls._model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        return cls._model.encode([text], normalize_embeddings=True).astype("float32")
+
+    def get(self, prompt: str, meta: Optional[Dict] = None) -> Optional[str]:
+        meta = meta or {}
+        vec = self._embed(prompt)  # embedding is the slow part; keep it unlocked
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None
+            k = min(self._index.ntotal, self.SEARCH_K)
+            scores, ids = self._index.search(vec, k)
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or float(score) < self.threshold:
+                    break  # results are sorted by score
+                entry = self._payloads[int(idx)]
+                if entry.get("meta", {}) != meta:
+                    continue
+                if self.ttl is not None and time.time() - entry["ts"] > self.ttl:
+                    continue
+                return entry["response"]
+        return None
+
+    def put(self, prompt: str, response: str, meta: Optional[Dict] = None):
+        vec = self._embed(prompt)
+        with self._lock:
+            self._index.add(vec)
+            self._payloads.append({
+                "response": response,
+                "ts": time.time(),
+                "meta": meta or {}
+            })
+            self._dirty = True
+            if time.monotonic() - self._last_persist >= self.PERSIST_INTERVAL:
+                self._persist_locked()
+
+    def _persist_locked(self):
+        # Caller holds self._lock.
+        faiss.write_index(self._index, str(self._index_path))
+        self._payload_path.write_text(json.dumps(self._payloads))
+        self._dirty = False
+        self._last_persist = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._persist_locked()
+
+    @classmethod
+    def _flush_all(cls):
+        for cache in cls._instances:
+            cache.flush()
+
+atexit.register(SemanticCache._flush_all)
+
+class RateLimiter:
+    """Proactive request/token budgeter for the Groq rate limits.
+
+    Every LLM call first takes a concurrency slot, a request from the
+    per-minute request bucket, and an estimated token allowance from the
+    per-minute token bucket. Parallel fan-outs then approach the provider
+    limits smoothly instead of triggering 429s and wasting wall-clock on
+    reactive exponential backoff.
+    """
+
+    def __init__(self, rpm: int = 30, tpm: int = 6000, max_concurrent: int = 8):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrent = max_concurrent
+        # Keyed weakly on the loop object itself: buckets die with their
+        # loop, and a new loop can never collide with a dead loop's
+        # recycled id and inherit primitives bound to a closed loop.
+        self._per_loop = weakref.WeakKeyDictionary()
+
+    def _buckets(self):
+        # asyncio primitives bind to the running loop, so keep one set of
+        # buckets per loop.
+        loop = asyncio.get_running_loop()
+        if loop not in self._per_loop:
+            self._per_loop[loop] = (
+                asyncio.Semaphore(self.max_concurrent),
+                AsyncLimiter(self.rpm, 60),
+                AsyncLimiter(self.tpm, 60)
+            )
+        return self._per_loop[loop]
+
+    @staticmethod
+    def estimate_tokens(payload) -> int:
+        text = json.dumps(payload, default=str)
+        try:
+            tokens = len(tiktoken.get_encoding("cl100k_base").encode(text))
+        except Exception:
+            tokens = len(text) // 4  # rough chars-per-token fallback
+        return tokens + 512  # headroom for the completion
+
+    async def run(self, chain, payload):
+        semaphore, request_bucket, token_bucket = self._buckets()
+        async with semaphore:
+            await request_bucket.acquire()
+            await token_bucket.acquire(min(self.estimate_tokens(payload), self.tpm))
+            return await chain.ainvoke(payload)
+
+    async def run_stream(self, chain, payload):
+        # Streaming counterpart of run(); the concurrency slot is held for
+        # the duration of the generation.
+        semaphore, request_bucket, token_bucket = self._buckets()
+        async with semaphore:
+            await request_bucket.acquire()
+            await token_bucket.acquire(min(self.estimate_tokens(payload), self.tpm))
+            async for chunk in chain.astream(payload):
+                yield chunk
+
+rate_limiter = RateLimiter()
+
+# In-flight request coalescing: concurrent identical invocations (the same
+# section requested twice, a duplicate custom section, etc.) share a single
+# future instead of issuing duplicate LLM calls. This only covers requests
+# overlapping in time; the response caches handle cross-request reuse.
+_inflight = {}
+
+async def coalesced_invoke(chain, payload):
+    loop = asyncio.get_running_loop()
+    key = (
+        id(loop),  # futures can't be awaited across event loops
+        id(chain),
+        hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+    )
+    existing = _inflight.get(key)
+    if existing is not None:
+        return await asyncio.shield(existing)
+    future = loop.create_future()
+    _inflight[key] = future
+    try:
+        result = await rate_limiter.run(chain, payload)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(key, None)
+        if not future.done():
+            # Cancelled before completing; unblock any duplicate waiters.
+            future.cancel()
+        else:
+            # Retrieve any stored exception so lone failures don't log
+            # "exception was never retrieved" when nothing was waiting.
+            future.exception()
+
+# Model tiers: the planners reason over long contexts on the large model,
+# while latency-critical steps run on a smaller model with much higher
+# decode throughput at similar quality for <2K-token contexts.
+MODEL_TIERS = {
+    "mixtral": "mixtral-8x7b-32768",
+    "fast": "llama-3.1-8b-instant"
+}
+
+# One warm keep-alive connection pool shared by every agent and tier.
+# Without it each request can pay a fresh TCP+TLS handshake, which is a
+# large fraction of first-token latency for short completions under the
+# async fan-out.
+_http_limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+shared_http_client = httpx.Client(http2=True, limits=_http_limits)
+shared_http_async_client = httpx.AsyncClient(http2=True, limits=_http_limits)
+
+# The pooled connections' transports are bound to the event loop that
+# opened them, so all async work must run on one persistent worker loop:
+# a per-job loop that closes when the job ends would leave dead
+# connections in the pool for the next job. Sharing the loop is also what
+# keeps the pool warm across generations.
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_lock = threading.Lock()
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return the persistent background loop all LLM jobs run on."""
+    global _worker_loop
+    with _worker_lock:
+        if _worker_loop is None:
+            _worker_loop = asyncio.new_event_loop()
+            threading.Thread(target=_worker_loop.run_forever, daemon=True).start()
+    return _worker_loop
+
+def _close_http_clients():
+    shared_http_client.close()
+    if _worker_loop is not None and _worker_loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(
+                shared_http_async_client.aclose(), _worker_loop
+            ).result(timeout=5)
+        except Exception:
+            pass
+
+atexit.register(_close_http_clients)
+
+_llm_cache: Dict[str, ChatGroq] = {}
+
+def make_llm(tier: str = "mixtral") -> ChatGroq:
+    """Return the shared ChatGroq instance for a model tier."""
+    if tier not in _llm_cache:
+        _llm_cache[tier] = ChatGroq(
+            model=MODEL_TIERS[tier],
+            temperature=0,
+            max_tokens=None,
+            timeout=None,
+            max_retries=2,
+            api_key=os.getenv("GROQ_API_KEY"),
+            http_client=shared_http_client,
+            http_async_client=shared_http_async_client
+        )
+    return _llm_cache[tier]
+
+# Default LLM for code that doesn't pick a tier explicitly.
+llm = make_llm("mixtral")
+
+# Compiled prompt | llm runnables, one per (chain name, llm instance),
+# shared across agent instances and worker threads. The prompts themselves
+# are parsed once at import as class attributes; this avoids rebuilding the
+# RunnableSequence every time an agent is constructed.
+_chain_cache = {}
+
+def compile_chain(name: str, llm_, factory):
+    key = (name, id(llm_))
+    if key not in _chain_cache:
+        _chain_cache[key] = factory()
+    return _chain_cache[key]
+
+@dataclass(slots=True, frozen=True)
 class CopyInput:
     product: str
     tone: str = ""
@@ -27,40 +335,105 @@ class CopyInput:
     industry: str = ""
     target_audience: str = ""
     brand_voice: str = ""
-    unique_selling_points: List[str] = None
+    unique_selling_points: Tuple[str, ...] = ()
+    usps_str: str = field(init=False, default="")
 
     def __post_init__(self):
-        self.unique_selling_points = self.unique_selling_points or []
+        # Frozen + slots: no per-instance __dict__, and the instance is
+        # hashable so caches can key on it directly. Normalized values are
+        # installed with object.__setattr__; callers may still pass a list
+        # of USPs.
+        object.__setattr__(
+            self, "unique_selling_points", tuple(self.unique_selling_points or ())
+        )
+        # Join and normalize the USPs once instead of on every agent call;
+        # stable formatting also keeps cosmetic whitespace diffs from
+        # invalidating the prompt-prefix and response caches downstream.
+        object.__setattr__(self, "usps_str", ", ".join(
+            " ".join(usp.split()) for usp in self.unique_selling_points if usp.strip()
+        ))
 
 class ResearchAgent:
-    def analyze_target_audience(self, copy_input: CopyInput) -> str:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert market researcher specializing in {industry}."),
-            ("human", """
-                Product: {product}
-                Target Audience: {audience}
-                Industry: {industry}
-                
-                Provide detailed insights about:
-                1. Demographics and psychographics
-                2. Pain points and challenges
-                3. Motivations and goals
-                4. Online behavior and preferences
-                5. Purchase decision factors
-            """)
-        ])
-        chain = prompt | llm
-        result = chain.invoke({
+    # The analysis skeleton is fixed, so there is no need for a skeleton
+    # call: each subsection is expanded by its own parallel request and the
+    # results are stitched back together in order. Wall time becomes the
+    # slowest subsection instead of the serially-decoded sum of all five.
+    SUBSECTIONS = [
+        "Demographics and psychographics",
+        "Pain points and challenges",
+        "Motivations and goals",
+        "Online behavior and preferences",
+        "Purchase decision factors"
+    ]
+
+    # The system message is a fixed block with no template variables so
+    # every call shares an identical prefix and provider-side prompt
+    # caching can hit on it; all per-call parameters live in the human
+    # message at the end.
+    SYSTEM = """You are an expert market researcher.
+
+Your job is to expand exactly one section of a target audience analysis for the product, audience and industry given in the user message. Other sections are handled separately.
+
+Guidelines:
+- Cover only the requested section.
+- Ground every insight in the provided product, audience and industry.
+- Be specific and actionable; avoid generic filler."""
+
+    model_tier = "mixtral"
+
+    PROMPT = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM),
+        ("human", """
+            Product: {product}
+            Target Audience: {audience}
+            Industry: {industry}
+
+            Provide detailed insights about: {topic}
+        """)
+    ])
+
+    def __init__(self, model_tier: Optional[str] = None):
+        self.llm = make_llm(model_tier or self.model_tier)
+        self.chain = compile_chain(
+            "research", self.llm, lambda: self.PROMPT | self.llm
+        )
+
+    async def _expand_subsection(self, topic: str, copy_input: CopyInput) -> str:
+        result = await coalesced_invoke(self.chain, {
             "industry": copy_input.industry,
             "product": copy_input.product,
-            "audience": copy_input.target_audience
+            "audience": copy_input.target_audience,
+            "topic": topic
         })
         return result.content
 
+    @cached_artifact("research", lambda copy_input: {
+        "product": copy_input.product,
+        "industry": copy_input.industry,
+        "target_audience": copy_input.target_audience
+    })
+    async def analyze_target_audience(self, copy_input: CopyInput) -> str:
+        expansions = await asyncio.gather(*[
+            self._expand_subsection(topic, copy_input)
+            for topic in self.SUBSECTIONS
+        ])
+        return "\n\n".join(
+            f"{i}. {topic}\n{expansion}"
+            for i, (topic, expansion) in enumerate(zip(self.SUBSECTIONS, expansions), 1)
+        )
+
 class StrategyAgent:
-    def create_content_strategy(self, research_data: str, copy_input: CopyInput) -> str:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", f"You are a content strategist specializing in {copy_input.tone} copy."),
+    model_tier = "mixtral"
+
+    PROMPT = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert content strategist.
+
+Your job is to turn audience research into a website content strategy, written in the tone given in the user message.
+
+Guidelines:
+- Base every recommendation on the research and unique selling points provided.
+- Keep the strategy concrete enough for a copywriter to execute directly.
+- Organize the strategy under the numbered headings requested."""),
             ("human", """
                 Research: {research}
                 Product: {product}
@@ -73,93 +446,470 @@ class StrategyAgent:
                 3. Section priorities
                 4. Conversion goals
             """)
-        ])
-        chain = prompt | llm
-        result = chain.invoke({
+    ])
+
+    COMPRESS_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", "You compress content strategies. Rewrite the strategy given in the user message as a compact bulletized brief within the stated token budget, preserving every directive, key message and constraint. Output only the brief."),
+        ("human", """
+                Token budget: {target_tokens}
+
+                Strategy:
+                {strategy}
+            """)
+    ])
+
+    def __init__(self, model_tier: Optional[str] = None):
+        self.llm = make_llm(model_tier or self.model_tier)
+        self.chain = compile_chain(
+            "strategy", self.llm, lambda: self.PROMPT | self.llm
+        )
+        self.compress_chain = compile_chain(
+            "strategy.compress", self.llm, lambda: self.COMPRESS_PROMPT | self.llm
+        )
+
+    @cached_artifact("strategy", lambda research_data, copy_input: {
+        "research": hashlib.sha256(research_data.encode()).hexdigest(),
+        "product": copy_input.product,
+        "tone": copy_input.tone,
+        "usps": copy_input.usps_str
+    })
+    async def create_content_strategy(self, research_data: str, copy_input: CopyInput) -> str:
+        result = await coalesced_invoke(self.chain, {
             "research": research_data,
             "product": copy_input.product,
             "tone": copy_input.tone,
-            "usps": ", ".join(copy_input.unique_selling_points)
+            "usps": copy_input.usps_str
+        })
+        return result.content
+
+    @cached_artifact("strategy_brief", lambda strategy, target_tokens=400: {
+        "strategy": hashlib.sha256(strategy.encode()).hexdigest(),
+        "target_tokens": target_tokens
+    })
+    async def compress_strategy(self, strategy: str, target_tokens: int = 400) -> str:
+        """Reduce the full strategy to a compact bulletized brief.
+
+        Every copywriting prompt re-sends the strategy, so total input
+        tokens scale with sections x strategy length. Compressing once up
+        front (cached by strategy hash) cuts that multiplier for the whole
+        run at the cost of a single short call.
+        """
+        result = await coalesced_invoke(self.compress_chain, {
+            "strategy": strategy,
+            "target_tokens": target_tokens
         })
         return result.content
 
 class CopywritingAgent:
-    def write_website_copy(self, strategy: str, section: str, copy_input: CopyInput) -> str:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Expert copywriter creating {length} {tone} content."),
-            ("human", """
+    semantic_cache = SemanticCache("copywriting")
+
+    # Static system blocks shared verbatim across every call (and every
+    # section), so provider-side prompt caching can hit on the prefix; tone
+    # and length are supplied through the human message instead of being
+    # templated into the system message.
+    WRITER_SYSTEM = """You are an expert copywriter.
+
+Write website copy in the tone and length given in the user message.
+
+Guidelines:
+- Lead with a clear value proposition and engaging headlines.
+- Weave the unique selling points in naturally.
+- Close with strategic calls to action."""
+
+    WRITER_EDITOR_SYSTEM = WRITER_SYSTEM + """
+
+After drafting, silently revise the copy for clarity, persuasiveness, brand voice consistency and grammar. Output only the final polished copy."""
+
+    BATCH_SYSTEM = WRITER_EDITOR_SYSTEM + """
+
+Produce copy for every section listed in the user message and return a JSON object mapping each section name to its final polished copy."""
+
+    # The three copywriting prompts share this human template; only the
+    # system block differs per mode.
+    SECTION_TEMPLATE = """
                 Strategy: {strategy}
                 Section: {section}
                 Product: {product}
                 Brand Voice: {brand_voice}
                 USPs: {usps}
-                
+
                 Write compelling copy focusing on:
                 - Clear value proposition
                 - Engaging headlines
                 - {tone} body copy of {length} length
                 - Strategic CTAs
-            """)
-        ])
-        chain = prompt | llm
-        result = chain.invoke({
+            """
+
+    model_tier = "fast"
+
+    BATCH_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", BATCH_SYSTEM),
+        ("human", """
+            Strategy: {strategy}
+            Sections: {sections}
+            Product: {product}
+            Brand Voice: {brand_voice}
+            USPs: {usps}
+
+            Write compelling copy for every section focusing on:
+            - Clear value proposition
+            - Engaging headlines
+            - {tone} body copy of {length} length
+            - Strategic CTAs
+        """)
+    ])
+
+    def __init__(self, model_tier: Optional[str] = None):
+        self.llm = make_llm(model_tier or self.model_tier)
+        self.batch_prompt = self.BATCH_PROMPT
+        # Groq supports OpenAI-style JSON mode, which guarantees a
+        # parseable object (though not that every section is present).
+        self.batch_chain = compile_chain(
+            "copywriting.batch", self.llm,
+            lambda: self.BATCH_PROMPT | self.llm.bind(
+                response_format={"type": "json_object"}
+            )
+        )
+
+    async def write_website_copy(self, strategy: str, section: str, copy_input: CopyInput) -> str:
+        variables = {
             "length": copy_input.length,
             "tone": copy_input.tone,
             "strategy": strategy,
             "section": section,
             "product": copy_input.product,
             "brand_voice": copy_input.brand_voice,
-            "usps": ", ".join(copy_input.unique_selling_points)
-        })
+            "usps": copy_input.usps_str
+        }
+        # Hot path: the per-section templates are plain strings, so a
+        # str.format_map plus explicit messages skips ChatPromptTemplate's
+        # validation and variable resolution on every call.
+        messages = [
+            SystemMessage(self.WRITER_SYSTEM),
+            HumanMessage(self.SECTION_TEMPLATE.format_map(variables))
+        ]
+        rendered = self.WRITER_SYSTEM + "\n" + messages[1].content
+        meta = {
+            "mode": "write",
+            "section": section,
+            "tone": copy_input.tone,
+            "length": copy_input.length
+        }
+        cached = self.semantic_cache.get(rendered, meta)
+        if cached is not None:
+            return cached
+        result = await coalesced_invoke(self.llm, messages)
+        self.semantic_cache.put(rendered, result.content, meta)
         return result.content
 
+    async def write_and_edit(self, strategy: str, section: str, copy_input: CopyInput) -> str:
+        # Fused draft + self-edit: one LLM call per section instead of a
+        # copywriter call followed by an editor call on its output.
+        variables = {
+            "length": copy_input.length,
+            "tone": copy_input.tone,
+            "strategy": strategy,
+            "section": section,
+            "product": copy_input.product,
+            "brand_voice": copy_input.brand_voice,
+            "usps": copy_input.usps_str
+        }
+        messages = [
+            SystemMessage(self.WRITER_EDITOR_SYSTEM),
+            HumanMessage(self.SECTION_TEMPLATE.format_map(variables))
+        ]
+        rendered = self.WRITER_EDITOR_SYSTEM + "\n" + messages[1].content
+        meta = {
+            "mode": "fused",
+            "section": section,
+            "tone": copy_input.tone,
+            "length": copy_input.length
+        }
+        cached = self.semantic_cache.get(rendered, meta)
+        if cached is not None:
+            return cached
+        result = await coalesced_invoke(self.llm, messages)
+        self.semantic_cache.put(rendered, result.content, meta)
+        return result.content
+
+    async def stream_and_edit(self, strategy: str, section: str, copy_input: CopyInput,
+                              on_text: Optional[Callable[[str], None]] = None) -> str:
+        """Streaming variant of write_and_edit.
+
+        `on_text` receives the accumulated copy after every decoded chunk,
+        so a UI can render tokens as they arrive instead of waiting behind
+        a spinner for the full generation. Returns the complete copy.
+        """
+        variables = {
+            "length": copy_input.length,
+            "tone": copy_input.tone,
+            "strategy": strategy,
+            "section": section,
+            "product": copy_input.product,
+            "brand_voice": copy_input.brand_voice,
+            "usps": copy_input.usps_str
+        }
+        messages = [
+            SystemMessage(self.WRITER_EDITOR_SYSTEM),
+            HumanMessage(self.SECTION_TEMPLATE.format_map(variables))
+        ]
+        rendered = self.WRITER_EDITOR_SYSTEM + "\n" + messages[1].content
+        meta = {
+            "mode": "fused",
+            "section": section,
+            "tone": copy_input.tone,
+            "length": copy_input.length
+        }
+        cached = self.semantic_cache.get(rendered, meta)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached)
+            return cached
+        parts = []
+        async for chunk in rate_limiter.run_stream(self.llm, messages):
+            parts.append(chunk.content)
+            if on_text is not None:
+                on_text("".join(parts))
+        content = "".join(parts)
+        self.semantic_cache.put(rendered, content, meta)
+        return content
+
+    async def write_all_sections(self, strategy: str, sections: List[str], copy_input: CopyInput) -> Dict[str, str]:
+        # Batched variant of write_and_edit: one structured JSON response
+        # covers every requested section, so the shared strategy context is
+        # transmitted once instead of once per section.
+        variables = {
+            "length": copy_input.length,
+            "tone": copy_input.tone,
+            "strategy": strategy,
+            "sections": ", ".join(sections),
+            "product": copy_input.product,
+            "brand_voice": copy_input.brand_voice,
+            "usps": copy_input.usps_str
+        }
+        rendered = self.batch_prompt.format(**variables)
+        meta = {
+            "mode": "batch",
+            "sections": ", ".join(sections),
+            "tone": copy_input.tone,
+            "length": copy_input.length
+        }
+        cached = self.semantic_cache.get(rendered, meta)
+        if cached is not None:
+            section_copy = json.loads(cached)
+        else:
+            result = await coalesced_invoke(self.batch_chain, variables)
+            section_copy = json.loads(result.content)
+            self.semantic_cache.put(rendered, result.content, meta)
+        return {section: section_copy[section] for section in sections}
+
 class EditorAgent:
-    def review_copy(self, copy: str) -> str:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert copy editor."),
-            ("human", """
-                Review this website copy:
-                {copy}
-                
-                Improve:
-                - Clarity and conciseness
-                - Persuasiveness
-                - Brand voice consistency
-                - Grammar and style
-            """)
-        ])
-        chain = prompt | llm
-        result = chain.invoke({"copy": copy})
+    semantic_cache = SemanticCache("editor")
+
+    model_tier = "fast"
+
+    REVIEW_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", "You are an expert copy editor."),
+        ("human", """
+            Review this website copy:
+            {copy}
+
+            Improve:
+            - Clarity and conciseness
+            - Persuasiveness
+            - Brand voice consistency
+            - Grammar and style
+        """)
+    ])
+    SECTIONS_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", "You are an expert copy editor. Keep every '## <section>' heading exactly as written and return the full document."),
+        ("human", """
+            Review this website copy:
+            {copy}
+
+            Improve:
+            - Clarity and conciseness
+            - Persuasiveness
+            - Cross-section consistency
+            - Grammar and style
+        """)
+    ])
+
+    def __init__(self, samples: int = 1, model_tier: Optional[str] = None):
+        # With samples > 1, each review races that many identical requests
+        # and keeps the first to finish. Single-call latency has a heavy
+        # tail, so the race trims tail latency at the cost of discarded
+        # tokens from the cancelled losers.
+        self.samples = samples
+        self.llm = make_llm(model_tier or self.model_tier)
+        self.review_prompt = self.REVIEW_PROMPT
+        self.review_chain = compile_chain(
+            "editor.review", self.llm, lambda: self.REVIEW_PROMPT | self.llm
+        )
+        self.sections_chain = compile_chain(
+            "editor.sections", self.llm, lambda: self.SECTIONS_PROMPT | self.llm
+        )
+
+    async def _invoke(self, chain, payload):
+        # Deliberately not coalesced: the samples > 1 race depends on
+        # issuing identical requests on purpose.
+        if self.samples <= 1:
+            return await rate_limiter.run(chain, payload)
+        tasks = [
+            asyncio.ensure_future(rate_limiter.run(chain, payload))
+            for _ in range(self.samples)
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        return next(iter(done)).result()
+
+    async def review_copy(self, copy: str) -> str:
+        rendered = self.review_prompt.format(copy=copy)
+        meta = {"mode": "review"}
+        cached = self.semantic_cache.get(rendered, meta)
+        if cached is not None:
+            return cached
+        result = await self._invoke(self.review_chain, {"copy": copy})
+        self.semantic_cache.put(rendered, result.content, meta)
         return result.content
 
+    async def review_sections(self, section_copy: Dict[str, str]) -> Dict[str, str]:
+        """One-shot consistency pass over all sections concatenated.
+
+        Editing the whole document once is cheaper than one editor call per
+        section and lets the model fix cross-section repetition. The section
+        headings are preserved so the reviewed document can be split back;
+        any section the model drops keeps its original copy.
+        """
+        document = "\n\n".join(
+            f"## {section}\n{copy}" for section, copy in section_copy.items()
+        )
+        result = await self._invoke(self.sections_chain, {"copy": document})
+
+        revised = {}
+        current = None
+        for line in result.content.splitlines():
+            if line.startswith("## "):
+                current = line[3:].strip().lower()
+                revised[current] = []
+            elif current is not None:
+                revised[current].append(line)
+        return {
+            section: "\n".join(revised[section]).strip()
+            if revised.get(section) else copy
+            for section, copy in section_copy.items()
+        }
+
 class WebsiteCopySystem:
-    def __init__(self):
+    def __init__(self, final_editor_pass: bool = False, low_latency: bool = False,
+                 fast_mode: bool = False):
+        # By default only the copywriter/editor run on the fast tier; with
+        # fast_mode the planners drop down to it as well.
+        self.final_editor_pass = final_editor_pass
+        tier = "fast" if fast_mode else None
         self.agents = {
-            "research": ResearchAgent(),
-            "strategy": StrategyAgent(),
-            "copywriting": CopywritingAgent(),
-            "editor": EditorAgent()
+            "research": ResearchAgent(model_tier=tier),
+            "strategy": StrategyAgent(model_tier=tier),
+            "copywriting": CopywritingAgent(model_tier=tier),
+            "editor": EditorAgent(samples=3 if low_latency else 1, model_tier=tier)
         }
 
-    def generate_website_copy(self, copy_input: CopyInput, sections: List[str]) -> Dict[str, str]:
+    # Below this per-section word count a temperature-0 draft rarely gains
+    # from another editor round-trip.
+    EDITOR_SKIP_WORDS = 120
+
+    def _needs_editor_pass(self, copy_input: CopyInput, section_copy: Dict[str, str]) -> bool:
+        if copy_input.length != "short":
+            return True
+        return any(
+            len(copy.split()) >= self.EDITOR_SKIP_WORDS
+            for copy in section_copy.values()
+        )
+
+    async def _section_pipeline(self, strategy: str, section: str, copy_input: CopyInput) -> str:
+        # Drafting and editing are fused into one call per section; see
+        # CopywritingAgent.write_and_edit.
+        return await self.agents["copywriting"].write_and_edit(
+            strategy,
+            section,
+            copy_input
+        )
+
+    async def agenerate_website_copy(self, copy_input: CopyInput, sections: List[str],
+                                     progress: Optional[Callable[[str, str], None]] = None,
+                                     stream: bool = False) -> Dict[str, str]:
+        """Generate copy for all sections.
+
+        `progress`, when given, is called with (section, copy) as each
+        section finishes so a UI can show partial results before the whole
+        run completes. It may be called from a worker thread's event loop.
+        With `stream=True` the sections run as a concurrent per-section
+        fan-out and `progress` additionally receives the accumulated copy
+        after every decoded chunk, so perceived latency drops to time to
+        first token.
+        """
         try:
-            research = self.agents["research"].analyze_target_audience(copy_input)
-            strategy = self.agents["strategy"].create_content_strategy(research, copy_input)
-            
-            section_copy = {}
-            for section in sections:
-                initial_copy = self.agents["copywriting"].write_website_copy(
-                    strategy,
-                    section,
-                    copy_input
+            research = await self.agents["research"].analyze_target_audience(copy_input)
+            strategy = await self.agents["strategy"].create_content_strategy(research, copy_input)
+            # The copywriting prompts get the compressed brief, not the
+            # full strategy, since it is re-sent with every section.
+            strategy = await self.agents["strategy"].compress_strategy(strategy)
+
+            if stream:
+                # Token streaming is per-section, so the single batched
+                # call doesn't apply here.
+                async def stream_section(section: str) -> str:
+                    on_text = None
+                    if progress is not None:
+                        on_text = lambda text, s=section: progress(s, text)
+                    return await self.agents["copywriting"].stream_and_edit(
+                        strategy, section, copy_input, on_text
+                    )
+
+                results = await asyncio.gather(*[
+                    stream_section(section) for section in sections
+                ])
+                section_copy = dict(zip(sections, results))
+
+                if self.final_editor_pass and self._needs_editor_pass(copy_input, section_copy):
+                    section_copy = await self.agents["editor"].review_sections(section_copy)
+                return section_copy
+
+            try:
+                section_copy = await self.agents["copywriting"].write_all_sections(
+                    strategy, sections, copy_input
                 )
-                final_copy = self.agents["editor"].review_copy(initial_copy)
-                section_copy[section] = final_copy
+                if progress is not None:
+                    for section, copy in section_copy.items():
+                        progress(section, copy)
+            except (json.JSONDecodeError, KeyError):
+                # The batched call returned malformed JSON or dropped a
+                # section; fall back to the concurrent per-section fan-out.
+                async def run_section(section: str) -> str:
+                    copy = await self._section_pipeline(strategy, section, copy_input)
+                    if progress is not None:
+                        progress(section, copy)
+                    return copy
+
+                results = await asyncio.gather(*[
+                    run_section(section) for section in sections
+                ])
+                section_copy = dict(zip(sections, results))
+
+            if self.final_editor_pass and self._needs_editor_pass(copy_input, section_copy):
+                section_copy = await self.agents["editor"].review_sections(section_copy)
             return section_copy
-            
+
         except Exception as e:
             raise Exception(f"Copy generation failed: {str(e)}")
 
+    def generate_website_copy(self, copy_input: CopyInput, sections: List[str]) -> Dict[str, str]:
+        return asyncio.run_coroutine_threadsafe(
+            self.agenerate_website_copy(copy_input, sections),
+            get_worker_loop()
+        ).result()
+
 if __name__ == "__main__":
     # Example usage
     input_data = CopyInput(
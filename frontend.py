@@ -1,21 +1,76 @@
 import streamlit as st
-from backend import WebsiteCopySystem, CopyInput
+from backend import WebsiteCopySystem, CopyInput, get_worker_loop
+import asyncio
 import json
+import queue
+import threading
 from pathlib import Path
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@st.cache_resource
+def get_system(fast_mode: bool = False) -> WebsiteCopySystem:
+    # One WebsiteCopySystem (and its precompiled agent chains) per mode,
+    # shared across reruns and sessions instead of rebuilding on every
+    # click.
+    return WebsiteCopySystem(fast_mode=fast_mode)
+
 def init_session_state():
     if 'generated_copy' not in st.session_state:
         st.session_state.generated_copy = {}
     if 'generation_complete' not in st.session_state:
         st.session_state.generation_complete = False
+    if 'job' not in st.session_state:
+        st.session_state.job = None
 
-def save_results(results: dict, filename: str):
-    output_dir = Path("generated_copy")
-    output_dir.mkdir(exist_ok=True)
-    
-    with open(output_dir / filename, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2)
+def start_generation(input_data: CopyInput, sections: list, fast_mode: bool = False) -> dict:
+    """Run the pipeline on a daemon thread and report progress via a queue.
+
+    The pipeline itself runs on the backend's persistent worker loop (so
+    the shared connection pool stays valid and warm across jobs); the
+    daemon thread just waits on it, keeping Streamlit's script thread free
+    while generation is in flight. Queue items are (section,
+    accumulated_copy) pairs emitted as tokens stream in, then a final
+    ("__done__", results) or ("__error__", message) sentinel.
+    """
+    progress_queue = queue.Queue()
+
+    def run():
+        try:
+            results = asyncio.run_coroutine_threadsafe(
+                get_system(fast_mode).agenerate_website_copy(
+                    input_data,
+                    sections,
+                    progress=lambda section, copy: progress_queue.put((section, copy)),
+                    stream=True
+                ),
+                get_worker_loop()
+            ).result()
+            progress_queue.put(("__done__", results))
+        except Exception as e:
+            progress_queue.put(("__error__", str(e)))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return {"queue": progress_queue, "thread": thread, "sections": sections}
+
+def serialize_results(results: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(results, indent=2)
+
+def save_results(serialized: str, filename: str):
+    # Write on a daemon thread so the rerun never blocks on disk I/O.
+    def _write():
+        output_dir = Path("generated_copy")
+        output_dir.mkdir(exist_ok=True)
+        (output_dir / filename).write_text(serialized, encoding='utf-8')
+
+    threading.Thread(target=_write, daemon=True).start()
 
 def main():
     st.set_page_config(
@@ -59,6 +114,11 @@ def main():
             options=["Short", "Medium", "Long"],
             value="Medium"
         )
+
+        fast_mode = st.toggle(
+            "Fast mode",
+            help="Run every agent on the smaller, faster model tier"
+        )
         
         brand_voice = st.text_area(
             "Brand Voice Description",
@@ -114,33 +174,69 @@ def main():
             st.error("Please fill in all required fields marked with *")
             return
             
-        try:
-            with st.spinner("Generating your website copy..."):
-                system = WebsiteCopySystem()
-                
-                input_data = CopyInput(
-                    product=product,
-                    tone=tone.lower(),
-                    length=length.lower(),
-                    industry=industry,
-                    target_audience=target_audience,
-                    brand_voice=brand_voice,
-                    unique_selling_points=usps
-                )
-                
-                results = system.generate_website_copy(input_data, sections)
-                st.session_state.generated_copy = results
+        input_data = CopyInput(
+            product=product,
+            tone=tone.lower(),
+            length=length.lower(),
+            industry=industry,
+            target_audience=target_audience,
+            brand_voice=brand_voice,
+            unique_selling_points=usps
+        )
+
+        # Kick generation off in the background; the polling block below
+        # picks up sections as they finish, so the UI never freezes mid-run.
+        st.session_state.generated_copy = {}
+        st.session_state.generation_complete = False
+        st.session_state.job = start_generation(input_data, sections, fast_mode)
+        st.session_state.job["product"] = product
+
+    # Poll the in-flight job, surfacing sections as they complete.
+    job = st.session_state.job
+    if job is not None:
+        error = None
+        while True:
+            try:
+                section, payload = job["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if section == "__error__":
+                error = payload
+                st.session_state.job = None
+                break
+            if section == "__done__":
+                st.session_state.generated_copy = payload
                 st.session_state.generation_complete = True
-                
-                # Save results
-                save_results(results, f"{product.lower().replace(' ', '_')}_copy.json")
-                
-            st.success("✅ Copy generated successfully!")
-            
-        except Exception as e:
-            st.error(f"Error generating copy: {str(e)}")
+                st.session_state.job = None
+                # Serialize once and reuse for both the saved file and the
+                # export button on every subsequent rerun.
+                st.session_state.exported_json = serialize_results(payload)
+                save_results(
+                    st.session_state.exported_json,
+                    f"{job['product'].lower().replace(' ', '_')}_copy.json"
+                )
+                break
+            st.session_state.generated_copy[section] = payload
+
+        if error is not None:
+            st.error(f"Error generating copy: {error}")
             return
-    
+        if st.session_state.job is not None:
+            # Render the partial copy streamed so far; the next rerun picks
+            # up whatever has decoded in the meantime.
+            st.caption("⏳ Generating your website copy...")
+            live_tabs = st.tabs([s.title() for s in job["sections"]])
+            for tab, section in zip(live_tabs, job["sections"]):
+                with tab:
+                    st.markdown(
+                        st.session_state.generated_copy.get(section, "_Waiting..._")
+                    )
+            time.sleep(0.5)
+            st.rerun()
+        else:
+            st.success("✅ Copy generated successfully!")
+
+
     # Display Results
     if st.session_state.generation_complete:
         st.header("Generated Website Copy")
@@ -164,7 +260,8 @@ def main():
         # Export all sections
         if st.download_button(
             "Export All Sections",
-            json.dumps(st.session_state.generated_copy, indent=2),
+            st.session_state.get("exported_json")
+            or serialize_results(st.session_state.generated_copy),
             file_name=f"{product.lower().replace(' ', '_')}_complete.json",
             mime="application/json"
         ):